@@ -1,20 +1,42 @@
 #!/usr/bin/env python3
 
+import gzip
+import io
 import random
+from itertools import accumulate
 import boto3
+from botocore.config import Config
+from boto3.s3.transfer import TransferConfig
 from datetime import datetime
-import time
+from concurrent.futures import ThreadPoolExecutor
 
 class LogGenerator:
-    def __init__(self, bucket_name):
-        self.s3_client = boto3.client('s3')
+    def __init__(self, bucket_name, seed=None):
+        # Keep in sync with client_config in log_monitor.py.
+        client_config = Config(
+            max_pool_connections=32,
+            retries={'max_attempts': 3, 'mode': 'adaptive'},
+            tcp_keepalive=True
+        )
+        self.s3_client = boto3.client('s3', config=client_config)
         self.bucket_name = bucket_name
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # 8 upload workers x 4 parts each fits the 32-connection pool above.
+        self.transfer_config = TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            multipart_chunksize=8 * 1024 * 1024,
+            max_concurrency=4,
+            use_threads=True
+        )
         
         self.endpoints = [
             '/api/users', '/api/products', '/api/orders',
             '/api/search', '/api/checkout', '/api/auth/login'
         ]
         
+        self.methods = ['GET', 'POST', 'PUT', 'DELETE']
+        
         self.status_codes = {
             200: 0.85,
             201: 0.05,
@@ -23,31 +45,36 @@ class LogGenerator:
             500: 0.03,
             503: 0.02
         }
+        self._codes = tuple(self.status_codes)
+        self._cum = list(accumulate(self.status_codes.values()))
         
         self.log_levels = ['INFO', 'WARN', 'ERROR', 'DEBUG']
+        self.quiet_levels = ['INFO', 'DEBUG']
+        
+        self.error_messages = [
+            'Database connection timeout',
+            'Exception in query execution',
+            'Failed to process request',
+            'Internal server error occurred'
+        ]
     
     def generate_log_entry(self):
-        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-        
-        status_code = random.choices(
-            list(self.status_codes.keys()),
-            weights=list(self.status_codes.values())
-        )[0]
-        
+        return self.generate_log_entries(1)[0]
+    
+    def response_time_range(self, status_code):
         if status_code < 400:
-            response_time = random.uniform(50, 500)
-        else:
-            response_time = random.uniform(500, 3000)
-        
-        endpoint = random.choice(self.endpoints)
-        method = random.choice(['GET', 'POST', 'PUT', 'DELETE'])
-        
+            return 50, 500
+        return 500, 3000
+    
+    def level_for(self, status_code):
         if status_code >= 500:
-            level = 'ERROR'
-        elif status_code >= 400:
-            level = 'WARN'
-        else:
-            level = random.choice(['INFO', 'DEBUG'])
+            return 'ERROR'
+        if status_code >= 400:
+            return 'WARN'
+        return None
+    
+    def format_log_entry(self, status_code, endpoint, method, response_time, level, error_message):
+        timestamp = datetime.utcnow().isoformat(sep=' ', timespec='milliseconds')
         
         log_entry = (
             f"[{timestamp}] {level} - "
@@ -56,38 +83,54 @@ class LogGenerator:
             f"response_time: {response_time:.2f}ms"
         )
         
-        if status_code >= 500:
-            errors = [
-                'Database connection timeout',
-                'Exception in query execution',
-                'Failed to process request',
-                'Internal server error occurred'
-            ]
-            log_entry += f" - {random.choice(errors)}"
+        if error_message:
+            log_entry += f" - {error_message}"
         
         return log_entry
     
-    def generate_log_file(self, num_entries=100):
-        print(f"Generating log file with {num_entries} entries...")
+    def generate_log_entries(self, num_entries, rng=None):
+        rng = rng or self.rng
+        status_codes = rng.choices(self._codes, cum_weights=self._cum, k=num_entries)
+        endpoints = rng.choices(self.endpoints, k=num_entries)
+        methods = rng.choices(self.methods, k=num_entries)
+        response_times = [
+            rng.uniform(*self.response_time_range(status_code))
+            for status_code in status_codes
+        ]
+        
+        levels = [self.level_for(status_code) for status_code in status_codes]
+        quiet_levels = iter(rng.choices(self.quiet_levels, k=levels.count(None)))
+        levels = [level or next(quiet_levels) for level in levels]
         
-        log_entries = []
-        for _ in range(num_entries):
-            log_entries.append(self.generate_log_entry())
+        messages = iter(rng.choices(self.error_messages, k=levels.count('ERROR')))
+        error_messages = [
+            next(messages) if level == 'ERROR' else None
+            for level in levels
+        ]
+        
+        return [
+            self.format_log_entry(*fields)
+            for fields in zip(status_codes, endpoints, methods, response_times, levels, error_messages)
+        ]
+    
+    def generate_log_file(self, num_entries=100, rng=None):
+        print(f"Generating log file with {num_entries} entries...")
         
-        return '\n'.join(log_entries)
+        return '\n'.join(self.generate_log_entries(num_entries, rng))
     
-    def upload_to_s3(self, log_content, prefix='logs/'):
+    def upload_to_s3(self, log_content, prefix='logs/', seq=0):
         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        key = f"{prefix}application_{timestamp}.log"
+        key = f"{prefix}application_{timestamp}_{seq:03d}.log"
         
         try:
             print(f"Uploading to s3://{self.bucket_name}/{key}")
             
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=key,
-                Body=log_content.encode('utf-8'),
-                ContentType='text/plain'
+            self.s3_client.upload_fileobj(
+                io.BytesIO(gzip.compress(log_content.encode('utf-8'), compresslevel=1)),
+                self.bucket_name,
+                key,
+                Config=self.transfer_config,
+                ExtraArgs={'ContentType': 'text/plain', 'ContentEncoding': 'gzip'}
             )
             
             print(f"Successfully uploaded log file")
@@ -96,21 +139,26 @@ class LogGenerator:
             print(f"Error uploading to S3: {e}")
             return None
     
+    def file_rng(self, seq):
+        if self.seed is None:
+            return random.Random()
+        return random.Random(f"{self.seed}-{seq}")
+    
+    def generate_and_upload_file(self, seq, num_files, entries_per_file):
+        print(f"\nFile {seq+1}/{num_files}")
+        log_content = self.generate_log_file(entries_per_file, rng=self.file_rng(seq))
+        return self.upload_to_s3(log_content, seq=seq)
+    
     def generate_and_upload(self, num_files=5, entries_per_file=100):
         print(f"Generating {num_files} log files...\n")
         
-        uploaded_files = []
+        with ThreadPoolExecutor(max_workers=max(1, min(num_files, 8))) as executor:
+            keys = list(executor.map(
+                lambda seq: self.generate_and_upload_file(seq, num_files, entries_per_file),
+                range(num_files)
+            ))
         
-        for i in range(num_files):
-            print(f"\nFile {i+1}/{num_files}")
-            log_content = self.generate_log_file(entries_per_file)
-            key = self.upload_to_s3(log_content)
-            
-            if key:
-                uploaded_files.append(key)
-            
-            if i < num_files - 1:
-                time.sleep(1)
+        uploaded_files = [key for key in keys if key]
         
         print(f"\nGenerated and uploaded {len(uploaded_files)} log files")
         return uploaded_files
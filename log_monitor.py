@@ -1,88 +1,144 @@
 #!/usr/bin/env python3
 
 import boto3
+from botocore.config import Config
+import gzip
 import json
-import re
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 import time
 
+class Metrics:
+    __slots__ = ('error_count', 'slow_responses', 'total_requests', 'avg_response_time')
+    
+    def __init__(self):
+        self.error_count = 0
+        self.slow_responses = 0
+        self.total_requests = 0
+        self.avg_response_time = 0
+
+
 class LogMonitor:
     def __init__(self, bucket_name, ec2_region='us-east-1'):
-        self.s3_client = boto3.client('s3')
-        self.ec2_client = boto3.client('ec2', region_name=ec2_region)
-        self.cloudwatch_client = boto3.client('cloudwatch', region_name=ec2_region)
+        # Keep in sync with client_config in log_generator.py.
+        client_config = Config(
+            max_pool_connections=32,
+            retries={'max_attempts': 3, 'mode': 'adaptive'},
+            tcp_keepalive=True
+        )
+        self.s3_client = boto3.client('s3', config=client_config)
+        self.ec2_client = boto3.client('ec2', region_name=ec2_region, config=client_config)
+        self.cloudwatch_client = boto3.client('cloudwatch', region_name=ec2_region, config=client_config)
+        self.autoscaling_client = boto3.client('autoscaling', config=client_config)
         self.bucket_name = bucket_name
-        self.metrics = {
-            'error_count': 0,
-            'slow_responses': 0,
-            'total_requests': 0,
-            'avg_response_time': 0
-        }
+        self.metrics = Metrics()
+        self._error_tokens = ('ERROR', 'Exception', 'Failed')
     
-    def download_logs_from_s3(self, prefix='logs/'):
-        print(f"Downloading logs from s3://{self.bucket_name}/{prefix}")
+    def collect_log_counts(self, prefix='logs/'):
+        print(f"Downloading and parsing logs from s3://{self.bucket_name}/{prefix}")
         
         try:
-            response = self.s3_client.list_objects_v2(
+            yesterday = (datetime.utcnow() - timedelta(days=1)).strftime('%Y%m%d')
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            pages = paginator.paginate(
                 Bucket=self.bucket_name,
-                Prefix=prefix
+                Prefix=prefix,
+                StartAfter=f"{prefix}application_{yesterday}"
             )
             
-            if 'Contents' not in response:
+            keys = deque(maxlen=10)
+            for page in pages:
+                keys.extend(obj['Key'] for obj in page.get('Contents', []))
+            
+            if not keys:
                 print("No log files found")
                 return []
             
-            log_contents = []
-            for obj in response['Contents'][-10:]:
-                key = obj['Key']
-                print(f"Fetching {key}")
-                
-                obj_data = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
-                content = obj_data['Body'].read().decode('utf-8')
-                log_contents.append(content)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                file_counts = list(executor.map(self.fetch_log_counts, keys))
             
-            return log_contents
+            return file_counts
         except Exception as e:
             print(f"Error downloading logs: {e}")
             return []
     
-    def parse_logs(self, log_contents):
-        print("\nParsing logs for metrics...")
+    def fetch_log_counts(self, key):
+        print(f"Fetching {key}")
         
-        response_times = []
-        error_pattern = r'(ERROR|FATAL|Exception|Failed)'
-        response_time_pattern = r'response_time[:\s]+(\d+\.?\d*)ms'
-        status_code_pattern = r'status[:\s]+(\d{3})'
+        obj_data = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+        body = obj_data['Body']
         
-        for log_content in log_contents:
-            lines = log_content.split('\n')
+        try:
+            if obj_data.get('ContentEncoding') == 'gzip':
+                lines = gzip.GzipFile(fileobj=body)
+            else:
+                lines = body.iter_lines()
             
-            for line in lines:
-                if not line.strip():
-                    continue
-                
-                self.metrics['total_requests'] += 1
-                
-                if re.search(error_pattern, line, re.IGNORECASE):
-                    self.metrics['error_count'] += 1
-                
-                time_match = re.search(response_time_pattern, line)
-                if time_match:
-                    response_time = float(time_match.group(1))
-                    response_times.append(response_time)
-                    
-                    if response_time > 1000:
-                        self.metrics['slow_responses'] += 1
-                
-                status_match = re.search(status_code_pattern, line)
-                if status_match:
-                    status_code = int(status_match.group(1))
-                    if status_code >= 500:
-                        self.metrics['error_count'] += 1
+            return self.count_log_lines(line.decode('utf-8') for line in lines)
+        finally:
+            body.close()
+    
+    def count_log_lines(self, lines):
+        total = 0
+        err = 0
+        slow = 0
+        rt_sum = 0.0
+        rt_n = 0
+        error_tokens = self._error_tokens
+        
+        for line in lines:
+            if not line.strip():
+                continue
+            
+            total += 1
+            
+            status_code = 0
+            i = line.rfind('status: ')
+            if i != -1:
+                code = line[i+8:i+11]
+                if code.isdigit():
+                    status_code = int(code)
+            
+            j = line.find('response_time: ')
+            if j != -1:
+                k = line.find('ms', j + 15)
+                if k != -1:
+                    try:
+                        response_time = float(line[j+15:k])
+                    except ValueError:
+                        pass
+                    else:
+                        rt_sum += response_time
+                        rt_n += 1
+                        
+                        if response_time > 1000:
+                            slow += 1
+            
+            if status_code >= 500 or any(token in line for token in error_tokens):
+                err += 1
+        
+        return total, err, slow, rt_sum, rt_n
+    
+    def record_counts(self, file_counts):
+        total = self.metrics.total_requests
+        err = self.metrics.error_count
+        slow = self.metrics.slow_responses
+        rt_sum = 0.0
+        rt_n = 0
+        
+        for file_total, file_err, file_slow, file_rt_sum, file_rt_n in file_counts:
+            total += file_total
+            err += file_err
+            slow += file_slow
+            rt_sum += file_rt_sum
+            rt_n += file_rt_n
         
-        if response_times:
-            self.metrics['avg_response_time'] = sum(response_times) / len(response_times)
+        self.metrics.total_requests = total
+        self.metrics.error_count = err
+        self.metrics.slow_responses = slow
+        if rt_n:
+            self.metrics.avg_response_time = rt_sum / rt_n
         
         self.print_metrics()
         return self.metrics
@@ -91,14 +147,14 @@ class LogMonitor:
         print("\n" + "="*50)
         print("METRICS SUMMARY")
         print("="*50)
-        print(f"Total Requests:     {self.metrics['total_requests']}")
-        print(f"Error Count:        {self.metrics['error_count']}")
-        print(f"Slow Responses:     {self.metrics['slow_responses']}")
-        print(f"Avg Response Time:  {self.metrics['avg_response_time']:.2f}ms")
+        print(f"Total Requests:     {self.metrics.total_requests}")
+        print(f"Error Count:        {self.metrics.error_count}")
+        print(f"Slow Responses:     {self.metrics.slow_responses}")
+        print(f"Avg Response Time:  {self.metrics.avg_response_time:.2f}ms")
         
-        if self.metrics['total_requests'] > 0:
-            error_rate = (self.metrics['error_count'] / self.metrics['total_requests']) * 100
-            slow_rate = (self.metrics['slow_responses'] / self.metrics['total_requests']) * 100
+        if self.metrics.total_requests > 0:
+            error_rate = (self.metrics.error_count / self.metrics.total_requests) * 100
+            slow_rate = (self.metrics.slow_responses / self.metrics.total_requests) * 100
             print(f"Error Rate:         {error_rate:.2f}%")
             print(f"Slow Response Rate: {slow_rate:.2f}%")
         print("="*50 + "\n")
@@ -110,30 +166,46 @@ class LogMonitor:
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(minutes=5)
         
-        for instance_id in instance_ids:
+        query_ids = {f'm{i}': instance_id for i, instance_id in enumerate(instance_ids)}
+        queries = [
+            {
+                'Id': query_id,
+                'MetricStat': {
+                    'Metric': {
+                        'Namespace': 'AWS/EC2',
+                        'MetricName': 'CPUUtilization',
+                        'Dimensions': [{'Name': 'InstanceId', 'Value': instance_id}]
+                    },
+                    'Period': 300,
+                    'Stat': 'Average'
+                }
+            }
+            for query_id, instance_id in query_ids.items()
+        ]
+        
+        for batch_start in range(0, len(queries), 500):
             try:
-                cpu_response = self.cloudwatch_client.get_metric_statistics(
-                    Namespace='AWS/EC2',
-                    MetricName='CPUUtilization',
-                    Dimensions=[{'Name': 'InstanceId', 'Value': instance_id}],
+                response = self.cloudwatch_client.get_metric_data(
+                    MetricDataQueries=queries[batch_start:batch_start + 500],
                     StartTime=start_time,
-                    EndTime=end_time,
-                    Period=300,
-                    Statistics=['Average']
+                    EndTime=end_time
                 )
                 
-                cpu_util = 0
-                if cpu_response['Datapoints']:
-                    cpu_util = cpu_response['Datapoints'][-1]['Average']
-                
-                metrics_data[instance_id] = {
-                    'cpu_utilization': cpu_util
-                }
-                
-                print(f"{instance_id}: CPU {cpu_util:.2f}%")
+                for result in response['MetricDataResults']:
+                    instance_id = query_ids[result['Id']]
+                    
+                    cpu_util = 0
+                    if result['Values']:
+                        cpu_util = result['Values'][0]
+                    
+                    metrics_data[instance_id] = {
+                        'cpu_utilization': cpu_util
+                    }
+                    
+                    print(f"{instance_id}: CPU {cpu_util:.2f}%")
                 
             except Exception as e:
-                print(f"Error fetching metrics for {instance_id}: {e}")
+                print(f"Error fetching metrics: {e}")
         
         return metrics_data
     
@@ -159,14 +231,14 @@ class LogMonitor:
                 scale_down = True
                 reasons.append(f"Low CPU utilization: {avg_cpu:.2f}%")
         
-        if self.metrics['total_requests'] > 0:
-            error_rate = (self.metrics['error_count'] / self.metrics['total_requests']) * 100
+        if self.metrics.total_requests > 0:
+            error_rate = (self.metrics.error_count / self.metrics.total_requests) * 100
             if error_rate > ERROR_RATE_THRESHOLD:
                 scale_up = True
                 reasons.append(f"High error rate: {error_rate:.2f}%")
         
-        if self.metrics['total_requests'] > 0:
-            slow_rate = (self.metrics['slow_responses'] / self.metrics['total_requests']) * 100
+        if self.metrics.total_requests > 0:
+            slow_rate = (self.metrics.slow_responses / self.metrics.total_requests) * 100
             if slow_rate > SLOW_RESPONSE_THRESHOLD:
                 scale_up = True
                 reasons.append(f"High slow response rate: {slow_rate:.2f}%")
@@ -186,10 +258,8 @@ class LogMonitor:
             return 'maintain'
     
     def trigger_auto_scaling(self, action, auto_scaling_group_name):
-        autoscaling_client = boto3.client('autoscaling')
-        
         try:
-            response = autoscaling_client.describe_auto_scaling_groups(
+            response = self.autoscaling_client.describe_auto_scaling_groups(
                 AutoScalingGroupNames=[auto_scaling_group_name]
             )
             
@@ -220,7 +290,7 @@ class LogMonitor:
                 print(f"\nNo scaling action taken (at capacity limits)")
                 return
             
-            autoscaling_client.set_desired_capacity(
+            self.autoscaling_client.set_desired_capacity(
                 AutoScalingGroupName=auto_scaling_group_name,
                 DesiredCapacity=new_capacity,
                 HonorCooldown=True
@@ -242,9 +312,9 @@ def main():
     
     monitor = LogMonitor(S3_BUCKET)
     
-    log_contents = monitor.download_logs_from_s3(LOG_PREFIX)
-    if log_contents:
-        monitor.parse_logs(log_contents)
+    file_counts = monitor.collect_log_counts(LOG_PREFIX)
+    if file_counts:
+        monitor.record_counts(file_counts)
     
     ec2_metrics = monitor.get_ec2_metrics(INSTANCE_IDS) if INSTANCE_IDS else {}
     
@@ -187,7 +187,7 @@ cat > /tmp/monitor-policy.json <<EOF
         "s3:GetObject",
         "s3:ListBucket",
         "ec2:DescribeInstances",
-        "cloudwatch:GetMetricStatistics",
+        "cloudwatch:GetMetricData",
         "autoscaling:DescribeAutoScalingGroups",
         "autoscaling:SetDesiredCapacity"
       ],